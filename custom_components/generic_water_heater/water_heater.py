@@ -20,14 +20,16 @@ from homeassistant.const import (
     STATE_UNKNOWN,
     TEMP_FAHRENHEIT,
 )
-from homeassistant.core import DOMAIN as HA_DOMAIN, callback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.core import DOMAIN as HA_DOMAIN, HassJob, callback
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
 from homeassistant.helpers.restore_state import RestoreEntity
 
 try:
-    from homeassistant.util.unit_conversion import TemperatureConverter as convert
-except ImportError or ModuleNotFoundError:
-    from homeassistant.util.temperature import convert as convert
+    from homeassistant.util.unit_conversion import TemperatureConverter
+
+    convert = TemperatureConverter.convert
+except ImportError:
+    from homeassistant.util.temperature import convert
 
 from . import CONF_HEATER, CONF_SENSOR, CONF_TARGET_TEMP, CONF_TEMP_DELTA, CONF_TEMP_MIN, CONF_TEMP_MAX
 
@@ -35,6 +37,21 @@ _LOGGER = logging.getLogger(__name__)
 
 SUPPORT_FLAGS_HEATER = SUPPORT_TARGET_TEMPERATURE | SUPPORT_OPERATION_MODE
 DEFAULT_NAME = "Generic Water Heater"
+# Seconds to coalesce temperature updates before running the control loop
+CONTROL_DELAY = 0.5
+
+_BAD_STATES = frozenset((STATE_UNAVAILABLE, STATE_UNKNOWN))
+_OPERATION_LIST = [STATE_ON, STATE_OFF]
+
+
+def _parse_temperature(state):
+    """Return state as a float, or None if it is not a valid temperature."""
+    if state is None or state in _BAD_STATES:
+        return None
+    try:
+        return float(state)
+    except (TypeError, ValueError):
+        return None
 
 
 async def async_setup_platform(
@@ -72,20 +89,29 @@ class GenericWaterHeater(WaterHeaterEntity, RestoreEntity):
         self._attr_name = name
         self.heater_entity_id = heater_entity_id
         self.sensor_entity_id = sensor_entity_id
+        self._service_data = {ATTR_ENTITY_ID: heater_entity_id}
         self._support_flags = SUPPORT_FLAGS_HEATER
         self._target_temperature = target_temp
         self._temperature_delta = temp_delta
+        self._update_temperature_bounds()
+        # Fall back to the HA defaults for Water Heaters when not configured
+        if min_temp is None:
+            min_temp = convert(DEFAULT_MIN_TEMP, TEMP_FAHRENHEIT, unit)
+        if max_temp is None:
+            max_temp = convert(DEFAULT_MAX_TEMP, TEMP_FAHRENHEIT, unit)
         self._min_temp = min_temp
         self._max_temp = max_temp
         self._unit_of_measurement = unit
         self._current_operation = STATE_ON
         self._current_temperature = None
-        self._operation_list = [
-            STATE_ON,
-            STATE_OFF,
-        ]
+        self._heater_state = None
+        self._operation_list = _OPERATION_LIST
         self._attr_available = False
         self._attr_should_poll = False
+        self._last_written_state = None
+        self._control_delay = CONTROL_DELAY
+        self._control_unsub = None
+        self._control_heating_job = HassJob(self._async_control_heating_later)
 
     @property
     def supported_features(self):
@@ -120,28 +146,23 @@ class GenericWaterHeater(WaterHeaterEntity, RestoreEntity):
     @property
     def min_temp(self):
         """Return the minimum targetable temperature."""
-        """If the min temperature is not set on the config, returns the HA default for Water Heaters."""
-        if not self._min_temp:
-            self._min_temp = convert(DEFAULT_MIN_TEMP, TEMP_FAHRENHEIT, self._unit_of_measurement)
         return self._min_temp
 
     @property
     def max_temp(self):
         """Return the maximum targetable temperature."""
-        """If the max temperature is not set on the config, returns the HA default for Water Heaters."""
-        if not self._max_temp:
-            self._max_temp = convert(DEFAULT_MAX_TEMP, TEMP_FAHRENHEIT, self._unit_of_measurement)
         return self._max_temp
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperatures."""
         self._target_temperature = kwargs.get(ATTR_TEMPERATURE)
-        await self._async_control_heating()
+        self._update_temperature_bounds()
+        await self._async_control_heating_and_wait()
 
     async def async_set_operation_mode(self, operation_mode):
         """Set new operation mode."""
         self._current_operation = operation_mode
-        await self._async_control_heating()
+        await self._async_control_heating_and_wait()
 
     async def async_added_to_hass(self):
         """Run when entity about to be added."""
@@ -149,58 +170,88 @@ class GenericWaterHeater(WaterHeaterEntity, RestoreEntity):
 
         self.async_on_remove(
             async_track_state_change_event(
-                self.hass, [self.sensor_entity_id], self._async_sensor_changed
-            )
-        )
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass, [self.heater_entity_id], self._async_switch_changed
+                self.hass,
+                [self.sensor_entity_id, self.heater_entity_id],
+                self._async_state_changed,
             )
         )
+        self.async_on_remove(self._async_cancel_control_heating)
 
         old_state = await self.async_get_last_state()
         if old_state is not None:
-            if old_state.attributes.get(ATTR_TEMPERATURE) is not None:
-                self._target_temperature = float(old_state.attributes.get(ATTR_TEMPERATURE))
+            target_temp = _parse_temperature(old_state.attributes.get(ATTR_TEMPERATURE))
+            if target_temp is not None:
+                self._target_temperature = target_temp
+                self._update_temperature_bounds()
             self._current_operation = old_state.state
 
         temp_sensor = self.hass.states.get(self.sensor_entity_id)
-        if temp_sensor and temp_sensor.state not in (
-            STATE_UNAVAILABLE,
-            STATE_UNKNOWN,
-        ):
-            self._current_temperature = float(temp_sensor.state)
+        if temp_sensor:
+            self._current_temperature = _parse_temperature(temp_sensor.state)
 
         heater_switch = self.hass.states.get(self.heater_entity_id)
-        if heater_switch and heater_switch.state not in (
-            STATE_UNAVAILABLE,
-            STATE_UNKNOWN,
-        ):
+        if heater_switch:
+            self._heater_state = heater_switch.state
+        if heater_switch and heater_switch.state not in _BAD_STATES:
             self._attr_available = True
+        self._last_written_state = self._observable_state()
         self.async_write_ha_state()
 
-    async def _async_sensor_changed(self, event):
+    @callback
+    def _async_state_changed(self, event):
+        """Dispatch state changes of the tracked sensor and heater switch."""
+        if event.data["entity_id"] == self.sensor_entity_id:
+            self._async_sensor_changed(event)
+        else:
+            self._async_switch_changed(event)
+
+    @callback
+    def _async_sensor_changed(self, event):
         """Handle temperature changes."""
         new_state = event.data.get("new_state")
-        if new_state is None or new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        temperature = None if new_state is None else _parse_temperature(new_state.state)
+        if temperature is None:
             # Failsafe
             _LOGGER.warning(
                 "No Temperature information, entering Failsafe, turning off heater %s",
                 self.heater_entity_id,
             )
-            await self._async_heater_turn_off()
+            self._async_cancel_control_heating()
+            self._async_heater_set(False)
             self._current_temperature = None
+            self._async_control_heating()
         else:
-            self._current_temperature = float(new_state.state)
+            self._current_temperature = temperature
+            self._async_schedule_control_heating()
 
-        await self._async_control_heating()
+    @callback
+    def _async_schedule_control_heating(self):
+        """Run the control loop once the current burst of updates settles."""
+        if self._control_unsub is None:
+            self._control_unsub = async_call_later(
+                self.hass, self._control_delay, self._control_heating_job
+            )
+
+    @callback
+    def _async_cancel_control_heating(self):
+        """Cancel a scheduled control loop run."""
+        if self._control_unsub is not None:
+            self._control_unsub()
+            self._control_unsub = None
+
+    @callback
+    def _async_control_heating_later(self, _now):
+        """Run the scheduled control loop with the latest reading."""
+        self._control_unsub = None
+        self._async_control_heating()
 
     @callback
     def _async_switch_changed(self, event):
         """Handle heater switch state changes."""
         new_state = event.data.get("new_state")
-        _LOGGER.debug(f"New switch state = {new_state}")
-        if new_state is None or new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        _LOGGER.debug("New switch state = %s", new_state)
+        self._heater_state = None if new_state is None else new_state.state
+        if new_state is None or new_state.state in _BAD_STATES:
             self._attr_available = False
         else:
             self._attr_available = True
@@ -212,43 +263,87 @@ class GenericWaterHeater(WaterHeaterEntity, RestoreEntity):
                 self._current_operation = STATE_OFF
                 _LOGGER.debug("STATE_OFF")
 
-        self.async_write_ha_state()
+        self._async_write_ha_state_if_changed()
 
-    async def _async_control_heating(self):
-        """Check if we need to turn heating on or off."""
-        if self._current_temperature is None:
+    @callback
+    def _async_control_heating(self):
+        """Check if we need to turn heating on or off.
+
+        Returns the task of the scheduled heater service call, if any.
+        """
+        task = None
+        current = self._current_temperature
+        if current is None:
             pass
         elif self._current_operation == STATE_OFF:
-            await self._async_heater_turn_off()
-        elif (
-            abs(self._current_temperature - self._target_temperature) > self._temperature_delta
-        ):
-            if self._current_temperature < self._target_temperature:
-                await self._async_heater_turn_on()
-            else:
-                await self._async_heater_turn_off()
-        self.async_write_ha_state()
-
-    async def _async_heater_turn_on(self):
-        """Turn heater toggleable device on."""
-        heater = self.hass.states.get(self.heater_entity_id)
-        if heater is None or heater.state == STATE_ON:
+            task = self._async_heater_set(False)
+        elif self._low_bound is None:
+            pass
+        elif current < self._low_bound:
+            task = self._async_heater_set(True)
+        elif current > self._high_bound:
+            task = self._async_heater_set(False)
+        self._async_write_ha_state_if_changed()
+        return task
+
+    async def _async_control_heating_and_wait(self):
+        """Run the control loop and wait for the heater service call to finish."""
+        task = self._async_control_heating()
+        if task is not None:
+            await task
+
+    def _update_temperature_bounds(self):
+        """Recompute the hysteresis band around the target temperature."""
+        if self._target_temperature is None:
+            self._low_bound = self._high_bound = None
             return
-
-        _LOGGER.debug("Turning on heater %s", self.heater_entity_id)
-        data = {ATTR_ENTITY_ID: self.heater_entity_id}
-        await self.hass.services.async_call(
-            HA_DOMAIN, SERVICE_TURN_ON, data, context=self._context
+        delta = self._temperature_delta or 0
+        self._low_bound = self._target_temperature - delta
+        self._high_bound = self._target_temperature + delta
+
+    def _observable_state(self):
+        """Return the attributes that make up the written state."""
+        return (
+            self._current_operation,
+            self._current_temperature,
+            self._target_temperature,
+            self._attr_available,
         )
 
-    async def _async_heater_turn_off(self):
-        """Turn heater toggleable device off."""
-        heater = self.hass.states.get(self.heater_entity_id)
-        if heater is None or heater.state == STATE_OFF:
+    @callback
+    def _async_write_ha_state_if_changed(self):
+        """Write state to HA only if an observable attribute changed."""
+        state = self._observable_state()
+        if state == self._last_written_state:
             return
+        self._last_written_state = state
+        self.async_write_ha_state()
 
-        _LOGGER.debug("Turning off heater %s", self.heater_entity_id)
-        data = {ATTR_ENTITY_ID: self.heater_entity_id}
-        await self.hass.services.async_call(
-            HA_DOMAIN, SERVICE_TURN_OFF, data, context=self._context
+    def _get_heater_state(self):
+        """Return the last seen heater state, looking it up if none was seen yet."""
+        if self._heater_state is None:
+            heater = self.hass.states.get(self.heater_entity_id)
+            if heater is not None:
+                self._heater_state = heater.state
+        return self._heater_state
+
+    @callback
+    def _async_heater_set(self, turn_on):
+        """Turn heater toggleable device on or off.
+
+        Returns the task of the scheduled service call, or None if the heater
+        is already in the requested state.
+        """
+        target_state = STATE_ON if turn_on else STATE_OFF
+        if self._get_heater_state() in (None, target_state):
+            return None
+
+        _LOGGER.debug("Turning %s heater %s", target_state, self.heater_entity_id)
+        return self.hass.async_create_task(
+            self.hass.services.async_call(
+                HA_DOMAIN,
+                SERVICE_TURN_ON if turn_on else SERVICE_TURN_OFF,
+                self._service_data,
+                context=self._context,
+            )
         )